@@ -0,0 +1,153 @@
+"""
+Mede o tempo de inicialização de servidor, PDV e cozinha até o primeiro RPC
+
+Cada medição roda num interpretador novo. Os tempos são contados a partir do
+lançamento do processo (time.monotonic é comum a todos os processos no
+Linux):
+
+- interface: módulo importado e pronto para exibir o menu
+- 1º RPC: primeira chamada concluída, sem espera do usuário
+- após digitação: duração da primeira chamada quando o operador leva
+  --digitacao segundos para preencher o pedido
+
+O modo "antes" importa grpc, pedidos_pb2, pedidos_pb2_grpc e rastreamento no
+início do processo, como era feito antes da importação tardia; o modo
+"depois" usa o código atual. O servidor precisa dos stubs para definir
+PedidoService e é medido apenas como está.
+
+Uso:
+    python benchmark_inicializacao.py [--rodadas 5] [--digitacao 1.0]
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import grpc
+import pedidos_pb2
+import pedidos_pb2_grpc
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+PORTA = 50051
+
+# Executado em um interpretador novo: argv = modo, entrada, digitação
+DRIVER = """
+import json, sys, time
+modo, entrada, digitacao = sys.argv[1], sys.argv[2], float(sys.argv[3])
+if modo == 'antes':
+    import grpc, pedidos_pb2, pedidos_pb2_grpc, rastreamento
+marcos = {}
+if entrada == 'pdv':
+    import pdv
+    if modo == 'depois':
+        pdv.preparar_conexao()
+    marcos['interface'] = time.monotonic()
+    time.sleep(digitacao)
+    marcos['envio'] = time.monotonic()
+    pdv.enviar_pedido('Benchmark', ['Pizza'])
+else:
+    import cozinha
+    marcos['interface'] = time.monotonic()
+    marcos['envio'] = marcos['interface']
+    stub = cozinha.pedidos_pb2_grpc.PedidoServiceStub(cozinha.abrir_canal())
+    stub.ReceberPedido(cozinha.pedidos_pb2.Vazio())
+marcos['resposta'] = time.monotonic()
+print('MARCOS ' + json.dumps(marcos), flush=True)
+"""
+
+def _ambiente():
+    ambiente = dict(os.environ)
+    ambiente['RASTREAMENTO_AMOSTRAGEM'] = '0'
+    return ambiente
+
+def medir_servidor():
+    """
+    Returns:
+        tuple: (processo do servidor em execução, segundos até o primeiro RPC)
+    """
+    inicio = time.monotonic()
+    processo = subprocess.Popen(
+        [sys.executable, 'servidor.py'], cwd=DIRETORIO, env=_ambiente(), stdout=subprocess.DEVNULL,
+        preexec_fn=lambda: signal.signal(signal.SIGINT, signal.SIG_DFL))
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', PORTA), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.002)
+    with grpc.insecure_channel(f'127.0.0.1:{PORTA}') as canal:
+        pedidos_pb2_grpc.PedidoServiceStub(canal).ReceberPedido(pedidos_pb2.Vazio())
+    return processo, time.monotonic() - inicio
+
+def parar_servidor(processo):
+    processo.send_signal(signal.SIGINT)
+    processo.wait()
+
+def medir_cliente(modo, entrada, digitacao):
+    """
+    Returns:
+        dict: Segundos até a interface, até o primeiro RPC e duração do RPC
+    """
+    inicio = time.monotonic()
+    saida = subprocess.run(
+        [sys.executable, '-c', DRIVER, modo, entrada, str(digitacao)],
+        cwd=DIRETORIO, env=_ambiente(), capture_output=True, text=True, check=True).stdout
+    # O monitor de status do PDV também escreve na saída
+    linha = next(linha for linha in saida.splitlines() if linha.startswith('MARCOS '))
+    marcos = json.loads(linha[len('MARCOS '):])
+    return {
+        'interface': marcos['interface'] - inicio,
+        'primeiro_rpc': marcos['resposta'] - inicio - (marcos['envio'] - marcos['interface']),
+        'duracao_rpc': marcos['resposta'] - marcos['envio'],
+    }
+
+def _ms(valores):
+    return f"{statistics.median(valores) * 1e3:>10.1f}" if valores else f"{'-':>10}"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Tempo até o primeiro RPC de cada ponto de entrada")
+    parser.add_argument('--rodadas', type=int, default=5, help="usa a mediana entre as rodadas")
+    parser.add_argument('--digitacao', type=float, default=1.0,
+                        help="segundos que o operador do PDV leva para preencher o pedido")
+    args = parser.parse_args()
+
+    try:
+        socket.create_connection(('127.0.0.1', PORTA), timeout=0.2).close()
+        sys.exit(f"Já existe um servidor na porta {PORTA}; encerre-o antes do benchmark")
+    except OSError:
+        pass
+
+    servidor = []
+    for _ in range(args.rodadas):
+        processo, segundos = medir_servidor()
+        servidor.append(segundos)
+        parar_servidor(processo)
+
+    processo, _ = medir_servidor()
+    resultados = {}
+    try:
+        for _ in range(args.rodadas):
+            for modo in ('antes', 'depois'):
+                for entrada in ('pdv', 'cozinha'):
+                    imediato = medir_cliente(modo, entrada, 0)
+                    chave = (entrada, modo)
+                    resultados.setdefault(chave, {'interface': [], 'primeiro_rpc': [], 'apos_digitacao': []})
+                    resultados[chave]['interface'].append(imediato['interface'])
+                    resultados[chave]['primeiro_rpc'].append(imediato['primeiro_rpc'])
+                    if entrada == 'pdv':
+                        digitado = medir_cliente(modo, entrada, args.digitacao)
+                        resultados[chave]['apos_digitacao'].append(digitado['duracao_rpc'])
+    finally:
+        parar_servidor(processo)
+
+    print(f"{'entrada':<10}{'modo':<8}{'interface':>10}{'1º RPC':>10}{'após digitação':>16}  (ms, mediana)")
+    print(f"{'servidor':<10}{'atual':<8}{'-':>10}{_ms(servidor)}{'-':>16}")
+    for (entrada, modo), valores in sorted(resultados.items()):
+        print(f"{entrada:<10}{modo:<8}{_ms(valores['interface'])}{_ms(valores['primeiro_rpc'])}"
+              f"{_ms(valores['apos_digitacao']):>16}")
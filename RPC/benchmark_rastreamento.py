@@ -0,0 +1,97 @@
+"""
+Mede o custo do rastreamento causal no ciclo completo de um pedido
+
+Cada ciclo faz EnviarPedido (PDV), ReceberPedido e AtualizarStatus (cozinha)
+contra um servidor local, sem interceptadores e com amostragem de 0%, 1% e
+100%. O servidor roda no mesmo processo, em porta livre.
+
+Uso:
+    python benchmark_rastreamento.py [--pedidos 2000] [--rodadas 3]
+"""
+
+import argparse
+import time
+from concurrent import futures
+
+import grpc
+import pedidos_pb2
+import pedidos_pb2_grpc
+import rastreamento
+from servidor import PedidoService
+
+def iniciar_servidor(interceptadores):
+    """
+    Returns:
+        tuple: (servidor gRPC, porta)
+    """
+    servidor = grpc.server(futures.ThreadPoolExecutor(max_workers=10), interceptors=interceptadores)
+    pedidos_pb2_grpc.add_PedidoServiceServicer_to_server(PedidoService(), servidor)
+    porta = servidor.add_insecure_port('127.0.0.1:0')
+    servidor.start()
+    return servidor, porta
+
+def executar_ciclos(stub, quantidade):
+    """
+    Returns:
+        float: Segundos gastos nos ciclos
+    """
+    inicio = time.perf_counter()
+    for _ in range(quantidade):
+        resposta = stub.EnviarPedido(pedidos_pb2.Pedido(cliente="Benchmark", itens=["Pizza", "Suco"]))
+        stub.ReceberPedido(pedidos_pb2.Vazio())
+        stub.AtualizarStatus(pedidos_pb2.AtualizacaoStatus(
+            numero_pedido=resposta.numero_pedido, novo_status="PRONTO"))
+    return time.perf_counter() - inicio
+
+def medir(taxa, quantidade):
+    """
+    Args:
+        taxa (float | None): Taxa de amostragem ou None para rodar sem interceptadores
+        quantidade (int): Número de ciclos
+
+    Returns:
+        tuple: (segundos, spans registrados)
+    """
+    if taxa is None:
+        servidor, porta = iniciar_servidor([])
+        canal = grpc.insecure_channel(f'127.0.0.1:{porta}')
+        rastreadores = []
+    else:
+        rastreador_servidor = rastreamento.Rastreador('servidor', taxa)
+        rastreador_cliente = rastreamento.Rastreador('pdv', taxa)
+        rastreadores = [rastreador_servidor, rastreador_cliente]
+        servidor, porta = iniciar_servidor([rastreamento.InterceptadorServidor(rastreador_servidor)])
+        canal = grpc.intercept_channel(
+            grpc.insecure_channel(f'127.0.0.1:{porta}'),
+            rastreamento.InterceptadorCliente(rastreador_cliente))
+    try:
+        with canal:
+            stub = pedidos_pb2_grpc.PedidoServiceStub(canal)
+            executar_ciclos(stub, min(100, quantidade))  # aquecimento
+            segundos = executar_ciclos(stub, quantidade)
+    finally:
+        servidor.stop(0).wait()
+    return segundos, sum(len(r.spans.itens()) for r in rastreadores)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Custo do rastreamento causal por pedido")
+    parser.add_argument('--pedidos', type=int, default=2000)
+    parser.add_argument('--rodadas', type=int, default=3, help="usa o melhor tempo entre as rodadas")
+    args = parser.parse_args()
+
+    cenarios = [("sem rastreamento", None), ("amostragem 0%", 0.0),
+                ("amostragem 1%", 0.01), ("amostragem 100%", 1.0)]
+    melhores = {nome: float('inf') for nome, _ in cenarios}
+    spans = {}
+    for _ in range(args.rodadas):
+        # Rodadas intercaladas para que variações da máquina afetem todos os cenários
+        for nome, taxa in cenarios:
+            segundos, spans[nome] = medir(taxa, args.pedidos)
+            melhores[nome] = min(melhores[nome], segundos)
+
+    base = melhores["sem rastreamento"]
+    print(f"{'cenário':<20}{'us/pedido':>12}{'sobrecarga':>12}{'spans':>8}")
+    for nome, _ in cenarios:
+        por_pedido = melhores[nome] / args.pedidos * 1e6
+        sobrecarga = (melhores[nome] / base - 1) * 100
+        print(f"{nome:<20}{por_pedido:>12.1f}{sobrecarga:>11.1f}%{spans[nome]:>8}")
@@ -0,0 +1,69 @@
+"""
+Importação tardia dos módulos gRPC e dos stubs gerados
+
+Importar grpc, pedidos_pb2 e pedidos_pb2_grpc leva cerca de 100 ms, tempo em
+que a interface do PDV ou da cozinha ainda não apareceu. ModuloTardio adia
+a importação até o primeiro uso de um atributo e permite antecipá-la numa
+thread em segundo plano enquanto o usuário interage com o menu.
+"""
+
+import importlib
+import threading
+
+class ModuloTardio:
+    """
+    Representa um módulo que só é importado no primeiro acesso a um atributo
+
+    Attributes:
+        nome (str): Nome do módulo importado
+    """
+
+    def __init__(self, nome):
+        """
+        Args:
+            nome (str): Nome do módulo, como em import
+        """
+        self.nome = nome
+        self._modulo = None
+        self._lock = threading.Lock()
+
+    def carregar(self):
+        """
+        Importa o módulo, uma única vez mesmo com várias threads
+
+        Returns:
+            module: Módulo importado
+        """
+        if self._modulo is None:
+            with self._lock:
+                if self._modulo is None:
+                    self._modulo = importlib.import_module(self.nome)
+        return self._modulo
+
+    def __getattr__(self, atributo):
+        return getattr(self.carregar(), atributo)
+
+    def __repr__(self):
+        estado = "carregado" if self._modulo is not None else "pendente"
+        return f"<ModuloTardio {self.nome} ({estado})>"
+
+def pre_carregar(*modulos, depois=None):
+    """
+    Importa os módulos numa thread daemon, sem bloquear quem chamou
+
+    Args:
+        modulos (ModuloTardio): Módulos a importar, na ordem dada
+        depois (callable, optional): Executado na mesma thread após as importações
+
+    Returns:
+        threading.Thread: Thread iniciada
+    """
+    def executar():
+        for modulo in modulos:
+            modulo.carregar()
+        if depois is not None:
+            depois()
+
+    thread = threading.Thread(target=executar, daemon=True)
+    thread.start()
+    return thread
@@ -2,12 +2,17 @@
 Módulo principal do cliente da cozinha para integração com serviço gRPC de pedidos.
 """
 
-import grpc
-import pedidos_pb2
-import pedidos_pb2_grpc
 import time
 import os
 
+from carregamento import ModuloTardio
+
+# Importados no primeiro uso, depois que a cozinha já exibiu que está iniciando
+grpc = ModuloTardio('grpc')
+pedidos_pb2 = ModuloTardio('pedidos_pb2')
+pedidos_pb2_grpc = ModuloTardio('pedidos_pb2_grpc')
+rastreamento = ModuloTardio('rastreamento')
+
 def processar_pedido(pedido):
     """
     Processa e exibe os detalhes de um pedido recebido.
@@ -50,13 +55,26 @@ def marcar_como_pronto(stub, numero_pedido):
     resposta = stub.AtualizarStatus(atualizacao)
     print(f"\n{resposta.mensagem}")
 
+def abrir_canal():
+    """
+    Abre o canal com o servidor, com rastreamento dos pedidos
+
+    Returns:
+        grpc.Channel: Canal com o interceptador de rastreamento
+    """
+    rastreador = rastreamento.configurar('cozinha')
+    return grpc.intercept_channel(
+        grpc.insecure_channel('localhost:50051'),
+        rastreamento.InterceptadorCliente(rastreador))
+
 def receber_pedidos():
     """
     Função principal que gerencia o fluxo de recebimento de pedidos.
     Configura a conexão gRPC e mantém loop contínuo para verificação de novos pedidos.
     """
+    print("Iniciando cozinha...")
     # Configuração do canal de comunicação gRPC
-    with grpc.insecure_channel('localhost:50051') as canal:
+    with abrir_canal() as canal:
         stub = pedidos_pb2_grpc.PedidoServiceStub(canal)
         print("Cozinha iniciada. Aguardando pedidos...")
         pedido_atual = None
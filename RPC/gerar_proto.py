@@ -1,9 +1,72 @@
-from grpc_tools import protoc
-
-protoc.main((
-    '',
-    '-I.',
-    '--python_out=.',
-    '--grpc_python_out=.',
-    'pedidos.proto',
-)) 
\ No newline at end of file
+"""
+Gera pedidos_pb2.py e pedidos_pb2_grpc.py a partir de pedidos.proto
+
+A geração só acontece quando o conteúdo do .proto ou a versão do
+grpcio-tools mudou desde a última execução, ou quando algum arquivo gerado
+está faltando. O hash usado na comparação fica em pedidos.proto.sha256.
+
+Uso:
+    python gerar_proto.py [--forcar]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from importlib import metadata
+
+PROTO = 'pedidos.proto'
+GERADOS = ('pedidos_pb2.py', 'pedidos_pb2_grpc.py')
+ARQUIVO_HASH = PROTO + '.sha256'
+
+def calcular_hash():
+    """
+    Returns:
+        str: SHA-256 do conteúdo do .proto e da versão do grpcio-tools
+    """
+    try:
+        versao = metadata.version('grpcio-tools')
+    except metadata.PackageNotFoundError:
+        versao = 'desconhecida'
+    with open(PROTO, 'rb') as arquivo:
+        conteudo = arquivo.read()
+    return hashlib.sha256(conteudo + b'\0' + versao.encode()).hexdigest()
+
+def precisa_gerar(hash_atual):
+    if not all(os.path.exists(gerado) for gerado in GERADOS):
+        return True
+    try:
+        with open(ARQUIVO_HASH, encoding='utf-8') as arquivo:
+            return arquivo.read().strip() != hash_atual
+    except FileNotFoundError:
+        return True
+
+def gerar():
+    # Importado só quando necessário: grpc_tools sozinho leva ~200 ms
+    from grpc_tools import protoc
+
+    return protoc.main((
+        '',
+        '-I.',
+        '--python_out=.',
+        '--grpc_python_out=.',
+        PROTO,
+    ))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera os stubs Python de pedidos.proto")
+    parser.add_argument('--forcar', action='store_true', help="gera mesmo sem alterações no .proto")
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    hash_atual = calcular_hash()
+    if not args.forcar and not precisa_gerar(hash_atual):
+        print(f"{PROTO} sem alterações; stubs mantidos")
+        sys.exit(0)
+
+    codigo = gerar()
+    if codigo != 0:
+        sys.exit(codigo)
+    with open(ARQUIVO_HASH, 'w', encoding='utf-8') as arquivo:
+        arquivo.write(hash_atual + '\n')
+    print(f"Stubs gerados a partir de {PROTO}")
@@ -0,0 +1,209 @@
+"""
+Reconstrói a linha do tempo causal de cada pedido a partir dos spans
+
+Lê os arquivos spans_<processo>.jsonl gravados por rastreamento.py e, para
+cada traço, monta o grafo de "aconteceu antes" entre os eventos de início e
+fim das chamadas:
+
+- eventos de uma mesma instância de processo, na ordem do relógio de
+  Lamport. Cozinhas diferentes, ou a mesma cozinha antes e depois de
+  reiniciar, gravam no mesmo arquivo mas têm relógios independentes;
+- início no cliente -> início no servidor e fim no servidor -> fim no
+  cliente, para cada par cliente/servidor da mesma RPC. O par é encontrado
+  pelo relógio da resposta, que o cliente sempre recebe do servidor.
+
+O caminho crítico começa no início do span raiz (a chamada do cliente que
+criou o traço, EnviarPedido no PDV). Ele não é procurado pelo menor relógio:
+valores de Lamport só ordenam eventos ligados causalmente, e a consulta da
+cozinha a ReceberPedido pode ter relógio menor que o envio do pedido, por
+exemplo logo depois de a cozinha reiniciar. A partir do último evento
+alcançável da origem, o caminho volta, a cada passo, para o predecessor
+alcançável que terminou por último, ou seja, aquele pelo qual o evento de
+fato esperou.
+
+Uso:
+    python linha_do_tempo.py spans_pdv.jsonl spans_servidor.jsonl spans_cozinha.jsonl
+    python linha_do_tempo.py spans_*.jsonl --pedido 42
+"""
+
+import argparse
+import json
+from collections import defaultdict
+
+# RPCs que iniciam um traço, como InterceptadorCliente.raizes
+RAIZES = ('EnviarPedido',)
+
+# Trechos entre eventos conhecidos recebem nomes das etapas do pedido
+NOMES_TRECHOS = {
+    (('fim', 'servidor', 'EnviarPedido'), ('inicio', 'servidor', 'ReceberPedido')): 'espera em fila_pedidos',
+    (('fim', 'cozinha', 'ReceberPedido'), ('inicio', 'cozinha', 'AtualizarStatus')): 'preparo na cozinha',
+}
+
+def carregar_spans(caminhos):
+    """
+    Args:
+        caminhos (list[str]): Arquivos JSON Lines com spans
+
+    Returns:
+        dict: Spans agrupados por identificador de traço
+    """
+    tracos = defaultdict(list)
+    for caminho in caminhos:
+        with open(caminho, encoding='utf-8') as arquivo:
+            for linha in arquivo:
+                if linha.strip():
+                    span = json.loads(linha)
+                    tracos[span['traco']].append(span)
+    return tracos
+
+def montar_eventos(spans):
+    """
+    Cria os eventos de início e fim e as arestas de causalidade entre eles
+
+    Returns:
+        tuple: (eventos, predecessores) onde cada evento é
+            (relógio, instante_ns, tipo, span) e predecessores[i] lista os
+            índices dos eventos que aconteceram imediatamente antes de i
+    """
+    eventos = []
+    for span in spans:
+        eventos.append((span['relogio_inicio'], span['inicio_ns'], 'inicio', span))
+        eventos.append((span['relogio_fim'], span['fim_ns'], 'fim', span))
+    predecessores = [[] for _ in eventos]
+
+    por_instancia = defaultdict(list)
+    for indice, evento in enumerate(eventos):
+        span = evento[3]
+        # Arquivos gravados antes do campo instancia têm uma execução por processo
+        por_instancia[span.get('instancia', span['processo'])].append(indice)
+    for indices in por_instancia.values():
+        indices.sort(key=lambda i: (eventos[i][0], eventos[i][1]))
+        for anterior, proximo in zip(indices, indices[1:]):
+            predecessores[proximo].append(anterior)
+
+    # Cada cliente é pareado com a última resposta da mesma RPC que ele pode ter recebido
+    clientes = sorted((i for i in range(0, len(eventos), 2) if eventos[i][3]['lado'] == 'cliente'),
+                      key=lambda i: eventos[i][3]['relogio_fim'])
+    servidores = [i for i in range(0, len(eventos), 2) if eventos[i][3]['lado'] == 'servidor']
+    pareados = set()
+    for cliente in clientes:
+        span = eventos[cliente][3]
+        candidatos = [i for i in servidores if i not in pareados
+                      and eventos[i][3]['rpc'] == span['rpc']
+                      and eventos[i][3]['relogio_fim'] < span['relogio_fim']]
+        if not candidatos:
+            continue
+        servidor = max(candidatos, key=lambda i: eventos[i][3]['relogio_fim'])
+        pareados.add(servidor)
+        predecessores[servidor].append(cliente)
+        predecessores[cliente + 1].append(servidor + 1)
+    return eventos, predecessores
+
+def _rotulo(evento):
+    _, _, tipo, span = evento
+    return tipo, span['processo'], span['rpc']
+
+def nome_trecho(anterior, proximo):
+    chave = (_rotulo(anterior), _rotulo(proximo))
+    if chave in NOMES_TRECHOS:
+        return NOMES_TRECHOS[chave]
+    tipo_a, processo_a, rpc_a = chave[0]
+    tipo_b, processo_b, rpc_b = chave[1]
+    if tipo_a == 'inicio' and tipo_b == 'fim' and (processo_a, rpc_a) == (processo_b, rpc_b):
+        return f"{processo_a} executando {rpc_a}"
+    if processo_a != processo_b:
+        return f"rede {processo_a} -> {processo_b} ({rpc_a})"
+    return f"{processo_a}: {tipo_a} {rpc_a} -> {tipo_b} {rpc_b}"
+
+def encontrar_origem(eventos, predecessores):
+    """
+    Returns:
+        int: Índice do início do span raiz ou, se ele não foi registrado, do
+            evento mais antigo entre os que não têm predecessores
+    """
+    raizes = [i for i in range(0, len(eventos), 2)
+              if eventos[i][3]['lado'] == 'cliente' and eventos[i][3]['rpc'] in RAIZES]
+    if not raizes:
+        raizes = [i for i, anteriores in enumerate(predecessores) if not anteriores] or range(len(eventos))
+    return min(raizes, key=lambda i: eventos[i][1])
+
+def caminho_critico(spans):
+    """
+    Returns:
+        list[tuple]: (nome do trecho, duração em ms) na ordem causal
+    """
+    eventos, predecessores = montar_eventos(spans)
+    if not eventos:
+        return []
+    sucessores = [[] for _ in eventos]
+    for indice, anteriores in enumerate(predecessores):
+        for anterior in anteriores:
+            sucessores[anterior].append(indice)
+
+    origem = encontrar_origem(eventos, predecessores)
+    alcancaveis = {origem}
+    pendentes = [origem]
+    while pendentes:
+        for proximo in sucessores[pendentes.pop()]:
+            if proximo not in alcancaveis:
+                alcancaveis.add(proximo)
+                pendentes.append(proximo)
+
+    atual = max(alcancaveis, key=lambda i: (eventos[i][0], eventos[i][1]))
+    caminho = [atual]
+    while atual != origem:
+        candidatos = [i for i in predecessores[atual] if i in alcancaveis]
+        atual = max(candidatos, key=lambda i: eventos[i][1])
+        caminho.append(atual)
+    caminho.reverse()
+
+    return [(nome_trecho(eventos[anterior], eventos[proximo]), (eventos[proximo][1] - eventos[anterior][1]) / 1e6)
+            for anterior, proximo in zip(caminho, caminho[1:])]
+
+def numero_do_pedido(spans):
+    return max((span['pedido'] for span in spans), default=0)
+
+def imprimir_traco(traco, spans):
+    eventos, _ = montar_eventos(spans)
+    eventos.sort(key=lambda evento: evento[1])
+    origem = eventos[0][1]
+    print(f"\n=== Pedido #{numero_do_pedido(spans)} (traço {traco}) ===")
+    for relogio, instante, tipo, span in eventos:
+        print(f"  +{(instante - origem) / 1e6:>10.2f} ms  L={relogio:<6} "
+              f"{span['processo']:<9} {tipo:<7} {span['rpc']} [{span['status']}]")
+
+    trechos = caminho_critico(spans)
+    total = sum(duracao for _, duracao in trechos)
+    print("  Caminho crítico:")
+    for nome, duracao in trechos:
+        parcela = duracao / total * 100 if total else 0
+        print(f"    {duracao:>10.2f} ms  {parcela:>5.1f}%  {nome}")
+    if trechos:
+        nome, duracao = max(trechos, key=lambda trecho: trecho[1])
+        print(f"  Maior trecho: {nome} ({duracao:.2f} ms de {total:.2f} ms)")
+
+def imprimir_resumo(tracos):
+    """Tempo médio por trecho do caminho crítico considerando todos os pedidos"""
+    somas = defaultdict(float)
+    contagens = defaultdict(int)
+    for spans in tracos.values():
+        for nome, duracao in caminho_critico(spans):
+            somas[nome] += duracao
+            contagens[nome] += 1
+    print(f"\n=== Resumo de {len(tracos)} pedidos ===")
+    for nome in sorted(somas, key=somas.get, reverse=True):
+        print(f"  {somas[nome] / contagens[nome]:>10.2f} ms  ({contagens[nome]:>4}x)  {nome}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Linha do tempo causal dos pedidos")
+    parser.add_argument('arquivos', nargs='+', help="arquivos spans_<processo>.jsonl")
+    parser.add_argument('--pedido', type=int, help="mostra apenas este pedido")
+    args = parser.parse_args()
+
+    tracos = carregar_spans(args.arquivos)
+    if args.pedido is not None:
+        tracos = {traco: spans for traco, spans in tracos.items() if numero_do_pedido(spans) == args.pedido}
+    for traco, spans in sorted(tracos.items(), key=lambda item: numero_do_pedido(item[1])):
+        imprimir_traco(traco, spans)
+    if len(tracos) > 1:
+        imprimir_resumo(tracos)
@@ -4,13 +4,61 @@ Módulo principal do sistema PDV (Ponto de Venda) para integração com serviço
 Gerencia a interface com o usuário e monitoramento de status de pedidos em tempo real
 """
 
-import grpc
-import pedidos_pb2
-import pedidos_pb2_grpc
 import threading
 import time
 from datetime import datetime
 
+from carregamento import ModuloTardio, pre_carregar
+
+# Importados no primeiro uso, para que o menu apareça antes do gRPC carregar
+grpc = ModuloTardio('grpc')
+pedidos_pb2 = ModuloTardio('pedidos_pb2')
+pedidos_pb2_grpc = ModuloTardio('pedidos_pb2_grpc')
+rastreamento = ModuloTardio('rastreamento')
+
+_canal = None
+_canal_lock = threading.Lock()
+
+def abrir_canal():
+    """
+    Retorna o canal com o servidor, criado no primeiro uso e compartilhado
+    por todos os pedidos e monitores
+
+    O canal propaga relógio lógico e traço do pedido.
+
+    Returns:
+        grpc.Channel: Canal com o interceptador de rastreamento
+    """
+    global _canal
+    with _canal_lock:
+        if _canal is None:
+            rastreador = rastreamento.configurar('pdv')
+            _canal = grpc.intercept_channel(
+                grpc.insecure_channel('localhost:50051'),
+                rastreamento.InterceptadorCliente(rastreador))
+        return _canal
+
+def conectar():
+    """
+    Estabelece a conexão com o servidor antes do primeiro pedido
+
+    Se o servidor não responder a tempo, o erro aparece na primeira chamada.
+    """
+    try:
+        grpc.channel_ready_future(abrir_canal()).result(timeout=5)
+    except grpc.FutureTimeoutError:
+        pass
+
+def preparar_conexao():
+    """
+    Carrega gRPC e stubs e conecta ao servidor em segundo plano,
+    enquanto o operador preenche o primeiro pedido
+
+    Returns:
+        threading.Thread: Thread de preparação
+    """
+    return pre_carregar(grpc, pedidos_pb2, pedidos_pb2_grpc, rastreamento, depois=conectar)
+
 class MonitorStatus(threading.Thread):
     """
     Thread para monitoramento contínuo do status de um pedido
@@ -39,15 +87,14 @@ class MonitorStatus(threading.Thread):
         
         Estabelece conexão contínua e exibe atualizações de status
         """
-        with grpc.insecure_channel('localhost:50051') as canal:
-            stub = pedidos_pb2_grpc.PedidoServiceStub(canal)
-            try:
-                for status in stub.MonitorarStatus(pedidos_pb2.NumeroPedido(numero_pedido=self.numero_pedido)):
-                    if status.status != self.ultimo_status:
-                        print(f"\n[Pedido #{self.numero_pedido}] Status: {status.status} ({status.timestamp})")
-                        self.ultimo_status = status.status
-            except grpc.RpcError as e:
-                print(f"Erro ao monitorar status: {e}")
+        stub = pedidos_pb2_grpc.PedidoServiceStub(abrir_canal())
+        try:
+            for status in stub.MonitorarStatus(pedidos_pb2.NumeroPedido(numero_pedido=self.numero_pedido)):
+                if status.status != self.ultimo_status:
+                    print(f"\n[Pedido #{self.numero_pedido}] Status: {status.status} ({status.timestamp})")
+                    self.ultimo_status = status.status
+        except grpc.RpcError as e:
+            print(f"Erro ao monitorar status: {e}")
 
 def enviar_pedido(cliente, itens):
     """
@@ -64,19 +111,18 @@ def enviar_pedido(cliente, itens):
         >>> enviar_pedido("João Silva", ["Pizza Margherita", "Refrigerante"])
         42
     """
-    with grpc.insecure_channel('localhost:50051') as canal:
-        stub = pedidos_pb2_grpc.PedidoServiceStub(canal)
-        pedido = pedidos_pb2.Pedido(
-            cliente=cliente,
-            itens=itens
-        )
-        resposta = stub.EnviarPedido(pedido)
-        print(f"\nResposta do servidor: {resposta.mensagem}")
-        
-        monitor = MonitorStatus(resposta.numero_pedido)
-        monitor.start()
-        
-        return resposta.numero_pedido
+    stub = pedidos_pb2_grpc.PedidoServiceStub(abrir_canal())
+    pedido = pedidos_pb2.Pedido(
+        cliente=cliente,
+        itens=itens
+    )
+    resposta = stub.EnviarPedido(pedido)
+    print(f"\nResposta do servidor: {resposta.mensagem}")
+    
+    monitor = MonitorStatus(resposta.numero_pedido)
+    monitor.start()
+    
+    return resposta.numero_pedido
 
 def menu_pdv():
     """
@@ -115,5 +161,6 @@ if __name__ == '__main__':
     Inicia o loop principal do menu e mantém a conexão com o servidor
     """
     print("PDV iniciado. Conectado ao servidor de pedidos.")
+    preparar_conexao()
     while menu_pdv():
         pass
\ No newline at end of file
@@ -0,0 +1,408 @@
+"""
+Rastreamento causal das chamadas gRPC entre PDV, servidor e cozinha
+
+Cada processo mantém um relógio lógico de Lamport (mesma regra de
+Process.logical_clock em exemploLamport/lamport.py) que viaja nos metadados
+das chamadas de pedidos amostrados, junto com o identificador do traço. Os
+spans registrados permitem reconstruir, com linha_do_tempo.py, onde o tempo
+de um pedido foi gasto.
+
+Chamadas de pedidos não amostrados não levam metadados: enviá-los custa mais
+que o próprio interceptador, e sem amostragem nada seria registrado. A
+exceção são as chamadas que não indicam o pedido, como ReceberPedido: o
+cliente só descobre o traço na resposta, então o relógio vai em todas elas
+enquanto a amostragem estiver ativa, e o traço apenas nas amostradas.
+"""
+
+import atexit
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from operator import itemgetter
+
+import grpc
+
+CHAVE_RELOGIO = 'x-relogio-lamport'
+CHAVE_TRACO = 'x-traco-id'
+
+class RelogioLamport:
+    """Relógio lógico escalar compartilhado pelas threads de um processo"""
+
+    def __init__(self):
+        self.valor = 0
+        self._lock = threading.Lock()
+
+    def incrementar(self):
+        """
+        Registra um evento local ou de envio
+
+        Returns:
+            int: Novo valor do relógio
+        """
+        with self._lock:
+            self.valor += 1
+            return self.valor
+
+    def receber(self, valor_recebido):
+        """
+        Ajusta o relógio ao receber uma mensagem: max(local, recebido) + 1
+
+        Args:
+            valor_recebido (int): Relógio enviado pelo outro processo
+
+        Returns:
+            int: Novo valor do relógio
+        """
+        with self._lock:
+            self.valor = max(self.valor, valor_recebido) + 1
+            return self.valor
+
+class Span:
+    """Intervalo de uma chamada RPC visto por um dos lados"""
+
+    __slots__ = ('traco', 'pedido', 'processo', 'instancia', 'rpc', 'lado', 'relogio_inicio', 'relogio_fim',
+                 'inicio_ns', 'fim_ns', 'status')
+
+    def __init__(self, traco, pedido, processo, instancia, rpc, lado, relogio_inicio, relogio_fim,
+                 inicio_ns, fim_ns, status):
+        self.traco = traco
+        self.pedido = pedido
+        self.processo = processo
+        self.instancia = instancia
+        self.rpc = rpc
+        self.lado = lado
+        self.relogio_inicio = relogio_inicio
+        self.relogio_fim = relogio_fim
+        self.inicio_ns = inicio_ns
+        self.fim_ns = fim_ns
+        self.status = status
+
+    def como_dict(self):
+        return {campo: getattr(self, campo) for campo in self.__slots__}
+
+class BufferCircular:
+    """
+    Buffer circular de tamanho fixo sem lock
+
+    O índice vem de itertools.count, cujo next() é atômico sob o GIL, e cada
+    escrita é uma única atribuição em lista. Quando cheio, os itens mais
+    antigos são sobrescritos.
+    """
+
+    def __init__(self, capacidade=65536):
+        self.capacidade = capacidade
+        self._posicoes = [None] * capacidade
+        self._proximo = itertools.count()
+
+    def registrar(self, item):
+        indice = next(self._proximo)
+        self._posicoes[indice % self.capacidade] = (indice, item)
+
+    def itens(self):
+        """
+        Returns:
+            list: Itens ainda presentes, do mais antigo para o mais recente
+        """
+        return self.desde(0)[0]
+
+    def desde(self, inicio):
+        """
+        Itens registrados a partir de um índice, para exportações sucessivas
+
+        Para no primeiro índice ainda não escrito: uma thread pode ter obtido
+        o índice e ainda não ter feito a atribuição.
+
+        Args:
+            inicio (int): Primeiro índice desejado
+
+        Returns:
+            tuple: (itens em ordem, índice a usar na próxima chamada)
+        """
+        ocupadas = [posicao for posicao in self._posicoes if posicao is not None and posicao[0] >= inicio]
+        ocupadas.sort(key=itemgetter(0))
+        itens = []
+        proximo = inicio
+        for indice, item in ocupadas:
+            if itens and indice != proximo:
+                break
+            itens.append(item)
+            proximo = indice + 1
+        return itens, proximo
+
+class Rastreador:
+    """
+    Estado de rastreamento de um processo
+
+    Attributes:
+        processo (str): Nome do processo ("pdv", "servidor" ou "cozinha")
+        instancia (str): Identifica esta execução (pid e instante de início),
+            pois várias cozinhas ou reinícios gravam no mesmo arquivo e cada
+            um tem seu próprio relógio
+        taxa_amostragem (float): Fração dos pedidos rastreados, entre 0 e 1
+        relogio (RelogioLamport): Relógio lógico do processo
+        spans (BufferCircular): Spans registrados
+        max_pedidos (int): Pedidos rastreados cujo traço é lembrado; acima
+            disso o mais antigo é esquecido, para que um servidor de longa
+            duração não guarde todos os pedidos
+    """
+
+    def __init__(self, processo, taxa_amostragem=0.01, capacidade=65536, max_pedidos=4096):
+        self.processo = processo
+        self.instancia = f"{os.getpid()}-{time.time_ns()}"
+        self.taxa_amostragem = taxa_amostragem
+        self.relogio = RelogioLamport()
+        self.spans = BufferCircular(capacidade)
+        self.max_pedidos = max_pedidos
+        self._tracos_por_pedido = {}
+        self._lock_pedidos = threading.Lock()
+        self._exportados = 0
+        self._lock_exportacao = threading.Lock()
+
+    def iniciar_traco(self):
+        """
+        Decide na origem se o pedido será rastreado
+
+        Returns:
+            str | None: Novo identificador de traço ou None se não amostrado
+        """
+        if self.taxa_amostragem > 0 and random.random() < self.taxa_amostragem:
+            return f"{random.getrandbits(64):016x}"
+        return None
+
+    def traco_do_pedido(self, numero_pedido):
+        return self._tracos_por_pedido.get(numero_pedido)
+
+    def associar(self, numero_pedido, traco):
+        with self._lock_pedidos:
+            self._tracos_por_pedido[numero_pedido] = traco
+            if len(self._tracos_por_pedido) > self.max_pedidos:
+                # O dicionário mantém a ordem de inserção: o primeiro é o mais antigo
+                del self._tracos_por_pedido[next(iter(self._tracos_por_pedido))]
+
+    def registrar(self, traco, pedido, rpc, lado, relogio_inicio, relogio_fim, inicio_ns, fim_ns, status):
+        self.spans.registrar(Span(traco, pedido, self.processo, self.instancia, rpc, lado,
+                                  relogio_inicio, relogio_fim, inicio_ns, fim_ns, status))
+
+    def exportar(self, caminho):
+        """
+        Acrescenta a um arquivo JSON Lines os spans registrados desde a
+        última exportação
+
+        Args:
+            caminho (str): Arquivo de destino
+        """
+        with self._lock_exportacao:
+            spans, proximo = self.spans.desde(self._exportados)
+            if not spans:
+                return
+            with open(caminho, 'a', encoding='utf-8') as arquivo:
+                for span in spans:
+                    arquivo.write(json.dumps(span.como_dict()) + '\n')
+            self._exportados = proximo
+
+def configurar(processo):
+    """
+    Cria o rastreador do processo a partir das variáveis de ambiente
+
+    - RASTREAMENTO_AMOSTRAGEM: fração de pedidos rastreados (padrão 0.01)
+    - RASTREAMENTO_DIR: diretório dos arquivos spans_<processo>.jsonl (padrão ".")
+    - RASTREAMENTO_INTERVALO: segundos entre gravações (padrão 5; 0 grava
+      apenas ao terminar)
+
+    Os spans são gravados periodicamente numa thread daemon e quando o
+    processo termina, de modo que uma cozinha encerrada por SIGTERM, pelo
+    fechamento do terminal ou por uma falha perde no máximo o último
+    intervalo.
+
+    Args:
+        processo (str): Nome do processo
+
+    Returns:
+        Rastreador: Rastreador configurado
+    """
+    taxa = float(os.environ.get('RASTREAMENTO_AMOSTRAGEM', '0.01'))
+    diretorio = os.environ.get('RASTREAMENTO_DIR', '.')
+    intervalo = float(os.environ.get('RASTREAMENTO_INTERVALO', '5'))
+    caminho = os.path.join(diretorio, f'spans_{processo}.jsonl')
+    rastreador = Rastreador(processo, taxa)
+    atexit.register(rastreador.exportar, caminho)
+    if intervalo > 0:
+        threading.Thread(target=_exportar_periodicamente, args=(rastreador, caminho, intervalo),
+                         daemon=True).start()
+    return rastreador
+
+def _exportar_periodicamente(rastreador, caminho, intervalo):
+    while True:
+        time.sleep(intervalo)
+        rastreador.exportar(caminho)
+
+def _ler_metadados(metadados):
+    relogio = None
+    traco = None
+    for chave, valor in metadados or ():
+        if chave == CHAVE_RELOGIO:
+            relogio = int(valor)
+        elif chave == CHAVE_TRACO:
+            traco = valor
+    return relogio, traco
+
+class _DetalhesChamada(grpc.ClientCallDetails):
+    def __init__(self, detalhes, metadata):
+        self.method = detalhes.method
+        self.timeout = detalhes.timeout
+        self.metadata = metadata
+        self.credentials = detalhes.credentials
+        self.wait_for_ready = detalhes.wait_for_ready
+        self.compression = detalhes.compression
+
+class InterceptadorCliente(grpc.UnaryUnaryClientInterceptor, grpc.UnaryStreamClientInterceptor):
+    """
+    Propaga relógio e traço nas chamadas feitas pelo PDV e pela cozinha
+
+    Um traço novo só é iniciado nas RPCs listadas em raizes; as demais
+    reutilizam o traço do pedido (campo numero_pedido da requisição) ou o
+    recebem do servidor nos metadados finais da resposta.
+    """
+
+    def __init__(self, rastreador, raizes=('EnviarPedido',)):
+        self.rastreador = rastreador
+        self.raizes = raizes
+
+    def _preparar(self, detalhes, request):
+        rpc = detalhes.method.rsplit('/', 1)[-1]
+        numero_pedido = getattr(request, 'numero_pedido', 0)
+        traco = self.rastreador.traco_do_pedido(numero_pedido) if numero_pedido else None
+        if traco is None and rpc in self.raizes:
+            traco = self.rastreador.iniciar_traco()
+        relogio = self.rastreador.relogio.incrementar()
+        if traco is not None:
+            metadados = list(detalhes.metadata or ())
+            metadados.append((CHAVE_RELOGIO, str(relogio)))
+            metadados.append((CHAVE_TRACO, traco))
+            detalhes = _DetalhesChamada(detalhes, metadados)
+        elif not numero_pedido and rpc not in self.raizes and self.rastreador.taxa_amostragem > 0:
+            # O pedido pode ser amostrado; sem o relógio, o início no servidor
+            # poderia ficar com valor menor que o início no cliente
+            metadados = list(detalhes.metadata or ())
+            metadados.append((CHAVE_RELOGIO, str(relogio)))
+            detalhes = _DetalhesChamada(detalhes, metadados)
+        return rpc, numero_pedido, traco, relogio, detalhes
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        rpc, numero_pedido, traco, relogio_inicio, detalhes = self._preparar(client_call_details, request)
+        inicio = time.time_ns()
+        chamada = continuation(detalhes, request)
+
+        relogio_servidor, traco_servidor = _ler_metadados(chamada.trailing_metadata())
+        if relogio_servidor is not None:
+            relogio_fim = self.rastreador.relogio.receber(relogio_servidor)
+        else:
+            relogio_fim = self.rastreador.relogio.incrementar()
+        fim = time.time_ns()
+
+        if chamada.code() == grpc.StatusCode.OK:
+            status = 'OK'
+            numero_resposta = getattr(chamada.result(), 'numero_pedido', 0)
+        else:
+            status = chamada.code().name
+            numero_resposta = 0
+        if traco is None:
+            traco = traco_servidor
+        if traco is not None:
+            numero_pedido = numero_pedido or numero_resposta
+            if numero_pedido:
+                self.rastreador.associar(numero_pedido, traco)
+            self.rastreador.registrar(traco, numero_pedido, rpc, 'cliente',
+                                      relogio_inicio, relogio_fim, inicio, fim, status)
+        return chamada
+
+    def intercept_unary_stream(self, continuation, client_call_details, request):
+        _, _, _, _, detalhes = self._preparar(client_call_details, request)
+        return continuation(detalhes, request)
+
+class InterceptadorServidor(grpc.ServerInterceptor):
+    """
+    Atualiza o relógio do servidor e registra um span por RPC unária
+
+    O relógio de resposta e o traço do pedido voltam nos metadados finais,
+    o que permite à cozinha continuar o traço de um pedido que ela apenas
+    recebeu por ReceberPedido.
+    """
+
+    def __init__(self, rastreador):
+        self.rastreador = rastreador
+        self._handlers = {}
+
+    def intercept_service(self, continuation, handler_call_details):
+        # O handler envolvido é o mesmo para todas as chamadas de um método
+        metodo = handler_call_details.method
+        if metodo not in self._handlers:
+            self._handlers[metodo] = self._envolver_handler(continuation(handler_call_details), metodo)
+        return self._handlers[metodo]
+
+    def _envolver_handler(self, handler, metodo):
+        if handler is None or handler.request_streaming:
+            return handler
+        rpc = metodo.rsplit('/', 1)[-1]
+        if handler.unary_unary is not None:
+            return grpc.unary_unary_rpc_method_handler(
+                self._envolver(handler.unary_unary, rpc),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer)
+        if handler.unary_stream is not None:
+            return grpc.unary_stream_rpc_method_handler(
+                self._envolver_stream(handler.unary_stream),
+                request_deserializer=handler.request_deserializer,
+                response_serializer=handler.response_serializer)
+        return handler
+
+    def _receber(self, context):
+        relogio_cliente, traco = _ler_metadados(context.invocation_metadata())
+        if relogio_cliente is not None:
+            return self.rastreador.relogio.receber(relogio_cliente), traco
+        return self.rastreador.relogio.incrementar(), traco
+
+    def _envolver(self, comportamento, rpc):
+        rastreador = self.rastreador
+
+        def tratar(request, context):
+            relogio_inicio, traco = self._receber(context)
+            numero_pedido = getattr(request, 'numero_pedido', 0)
+            if traco is None and numero_pedido:
+                traco = rastreador.traco_do_pedido(numero_pedido)
+            inicio = time.time_ns()
+            try:
+                resposta = comportamento(request, context)
+            except Exception:
+                if traco is not None:
+                    relogio_fim = rastreador.relogio.incrementar()
+                    rastreador.registrar(traco, numero_pedido, rpc, 'servidor', relogio_inicio, relogio_fim,
+                                         inicio, time.time_ns(), 'ERRO')
+                raise
+
+            numero_resposta = getattr(resposta, 'numero_pedido', 0)
+            if numero_resposta:
+                if traco is None:
+                    traco = rastreador.traco_do_pedido(numero_resposta)
+                elif rastreador.traco_do_pedido(numero_resposta) is None:
+                    rastreador.associar(numero_resposta, traco)
+            relogio_fim = rastreador.relogio.incrementar()
+            fim = time.time_ns()
+
+            if traco is not None:
+                context.set_trailing_metadata(((CHAVE_RELOGIO, str(relogio_fim)), (CHAVE_TRACO, traco)))
+                rastreador.registrar(traco, numero_pedido or numero_resposta, rpc, 'servidor',
+                                     relogio_inicio, relogio_fim, inicio, fim, 'OK')
+            return resposta
+
+        return tratar
+
+    def _envolver_stream(self, comportamento):
+        def tratar(request, context):
+            self._receber(context)
+            return comportamento(request, context)
+
+        return tratar
@@ -13,6 +13,7 @@ from concurrent import futures
 import time
 import pedidos_pb2
 import pedidos_pb2_grpc
+import rastreamento
 from collections import deque
 from datetime import datetime
 import threading
@@ -182,8 +183,12 @@ def iniciar_servidor():
     - Porta: 50051
     - Workers: 10 threads
     - Conexão insegura (para ambiente de desenvolvimento)
+    - Rastreamento causal com amostragem definida em RASTREAMENTO_AMOSTRAGEM
     """
-    servidor = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    rastreador = rastreamento.configurar('servidor')
+    servidor = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=10),
+        interceptors=[rastreamento.InterceptadorServidor(rastreador)])
     pedidos_pb2_grpc.add_PedidoServiceServicer_to_server(
         PedidoService(), servidor)
     servidor.add_insecure_port('[::]:50051')
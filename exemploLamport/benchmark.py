@@ -0,0 +1,203 @@
+"""Benchmarks for the Lamport clock examples.
+
+Usage:
+    python benchmark.py sim [--processes 10 100 1000 10000] [--events 100]
+    python benchmark.py clocks [--processes 10 100 1000 10000] [--messages 5000]
+    python benchmark.py net [--processes 2 4 8 16] [--count 200]
+"""
+
+from array import array
+from operator import gt
+import argparse
+import random
+import time
+
+from causal import CausalDeliveryBuffer, CausalMessage
+from clocks import compare, encode, merge, zeros
+from lamport import run_threaded
+from network import LAMPORT, RICART_AGRAWALA, run_cluster
+from simulation import run_simulated
+
+def _rate(count, elapsed):
+    return count / elapsed if elapsed > 0 else float('inf')
+
+def benchmark_sim(args):
+    """Thread-based example versus the discrete-event engine.
+
+    Both modes use the same delay range; the threaded mode really sleeps for
+    it while the simulation only advances virtual time.
+    """
+    delay = tuple(args.delay)
+    print(f"{'mode':<10}{'processes':>10}{'events':>12}{'seconds':>10}{'events/s':>14}{'max clock':>11}")
+    for total in args.processes:
+        if total <= args.max_threads:
+            start = time.perf_counter()
+            processes = run_threaded(total, args.events, delay, seed=args.seed,
+                                     mailbox_size=args.mailbox_size, verbose=False)
+            elapsed = time.perf_counter() - start
+            max_clock = max(p.logical_clock for p in processes)
+            if args.mailbox_size is None:
+                # every action is an internal event or a send, plus one receive per mailbox entry
+                count = total * args.events + sum(len(p.mailbox) for p in processes)
+                print(f"{'threads':<10}{total:>10}{count:>12}{elapsed:>10.3f}{_rate(count, elapsed):>14.0f}{max_clock:>11}")
+            else:
+                print(f"{'threads':<10}{total:>10}{'-':>12}{elapsed:>10.3f}{'-':>14}{max_clock:>11}")
+
+        start = time.perf_counter()
+        sim = run_simulated(total, args.events, delay, seed=args.seed, mailbox_size=args.mailbox_size)
+        elapsed = time.perf_counter() - start
+        print(f"{'simulated':<10}{total:>10}{sim.processed:>12}{elapsed:>10.3f}"
+              f"{_rate(sim.processed, elapsed):>14.0f}{max(sim.logical_clocks):>11}")
+
+def _timeit(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+class _RescanningBuffer:
+    """Hold-back queue that rescans every held message after each delivery."""
+
+    def __init__(self, total_processes):
+        self.delivered = zeros(total_processes)
+        self.held = []
+
+    def _deliverable(self, message):
+        sender = message.sender_id
+        if message.counters[sender] != self.delivered[sender] + 1:
+            return False
+        ahead = list(map(gt, message.counters, self.delivered))
+        ahead[sender] = False
+        return not any(ahead)
+
+    def receive(self, message):
+        self.held.append(message)
+        delivered = []
+        progress = True
+        while progress:
+            progress = False
+            for held in self.held:
+                if self._deliverable(held):
+                    self.held.remove(held)
+                    self.delivered[held.sender_id] += 1
+                    delivered.append(held)
+                    progress = True
+                    break
+        return delivered
+
+def _causal_trace(total, messages, catch_up, active, rng):
+    """Broadcasts from `active` random senders that only occasionally learn
+    about everyone else's messages, so the trace mixes causal chains and
+    concurrent messages."""
+    senders = rng.sample(range(total), min(active, total))
+    known = {pid: zeros(total) for pid in senders}
+    latest = zeros(total)
+    trace = []
+    for i in range(messages):
+        sender = rng.choice(senders)
+        if rng.random() < catch_up:
+            known[sender] = array('Q', latest)
+        counters = known[sender]
+        counters[sender] += 1
+        latest[sender] = counters[sender]
+        trace.append(CausalMessage(sender, array('Q', counters), i))
+    return trace
+
+def benchmark_clocks(args):
+    """Vector clock merge/compare/encode cost and causal delivery cost."""
+    rng = random.Random(args.seed)
+    print(f"{'processes':>10}{'merge us':>10}{'compare us':>12}{'dense B':>9}{'sparse B':>10}"
+          f"{'indexed ms':>12}{'rescan ms':>11}{'max held':>10}")
+    for total in args.processes:
+        a = array('Q', (rng.randrange(1000) for _ in range(total)))
+        b = array('Q', (rng.randrange(1000) for _ in range(total)))
+        repeat = max(10, 200000 // total)
+        merge_cost = _timeit(lambda: merge(a, b), repeat)
+        compare_cost = _timeit(lambda: compare(a, b), repeat)
+
+        trace = _causal_trace(total, args.messages, args.catch_up, args.active, rng)
+        sparse = trace[-1].counters
+        dense_size = len(encode(sparse, compress=False))
+        sparse_size = len(encode(sparse))
+
+        # Network reordering: every message may overtake up to `window` earlier ones
+        arrival = sorted(trace, key=lambda m: m.content + rng.uniform(0, args.window))
+
+        buffer = CausalDeliveryBuffer(total)
+        max_held = 0
+        start = time.perf_counter()
+        for message in arrival:
+            buffer.receive(message)
+            max_held = max(max_held, buffer.held)
+        indexed = time.perf_counter() - start
+        assert buffer.held == 0 and sum(buffer.delivered) == len(trace)
+
+        if total <= args.max_rescan:
+            naive = _RescanningBuffer(total)
+            start = time.perf_counter()
+            for message in arrival:
+                naive.receive(message)
+            rescan = f"{(time.perf_counter() - start) * 1e3:>11.1f}"
+        else:
+            rescan = f"{'-':>11}"
+
+        print(f"{total:>10}{merge_cost * 1e6:>10.2f}{compare_cost * 1e6:>12.2f}{dense_size:>9}{sparse_size:>10}"
+              f"{indexed * 1e3:>12.1f}{rescan}{max_held:>10}")
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+def benchmark_net(args):
+    """Lock throughput and multicast latency of the asyncio TCP runtime."""
+    print(f"{'processes':>10}  {'workload':<24}{'ops/s':>10}{'mean ms':>10}{'p50 ms':>9}{'p99 ms':>9}{'frames/write':>14}")
+    for total in args.processes:
+        for algorithm in (LAMPORT, RICART_AGRAWALA):
+            results = run_cluster(total, 'mutex', args.count, algorithm)
+            elapsed = max(result['elapsed'] for result in results)
+            batching = sum(r['frames_sent'] for r in results) / max(1, sum(r['writes'] for r in results))
+            print(f"{total:>10}  {'mutex ' + algorithm:<24}{total * args.count / elapsed:>10.0f}"
+                  f"{'-':>10}{'-':>9}{'-':>9}{batching:>14.1f}")
+
+        results = run_cluster(total, 'multicast', args.count)
+        elapsed = max(result['elapsed'] for result in results)
+        latencies = sorted(latency / 1e6 for result in results for latency in result['latencies'])
+        batching = sum(r['frames_sent'] for r in results) / max(1, sum(r['writes'] for r in results))
+        print(f"{total:>10}  {'total-order multicast':<24}{total * args.count / elapsed:>10.0f}"
+              f"{sum(latencies) / len(latencies):>10.2f}{_percentile(latencies, 0.5):>9.2f}"
+              f"{_percentile(latencies, 0.99):>9.2f}{batching:>14.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks for the Lamport clock examples")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    sim = commands.add_parser('sim', help="threads vs discrete-event simulation")
+    sim.add_argument('--processes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    sim.add_argument('--events', type=int, default=100, help="events performed by each process")
+    sim.add_argument('--delay', type=float, nargs=2, default=(0.0, 0.001), metavar=('MIN', 'MAX'),
+                     help="delay between events; the threaded mode really sleeps for it")
+    sim.add_argument('--max-threads', type=int, default=1000,
+                     help="skip the threaded mode above this many processes")
+    sim.add_argument('--mailbox-size', type=int, default=None)
+    sim.add_argument('--seed', type=int, default=1)
+    sim.set_defaults(run=benchmark_sim)
+
+    clocks = commands.add_parser('clocks', help="vector clock operations and causal delivery")
+    clocks.add_argument('--processes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    clocks.add_argument('--messages', type=int, default=5000, help="broadcasts delivered to one receiver")
+    clocks.add_argument('--active', type=int, default=50, help="processes that actually broadcast")
+    clocks.add_argument('--catch-up', type=float, default=0.2,
+                        help="probability a sender learns every earlier message before sending")
+    clocks.add_argument('--window', type=float, default=200, help="how far a message may be reordered")
+    clocks.add_argument('--max-rescan', type=int, default=1000,
+                        help="skip the rescanning buffer above this many processes")
+    clocks.add_argument('--seed', type=int, default=1)
+    clocks.set_defaults(run=benchmark_clocks)
+
+    net = commands.add_parser('net', help="mutual exclusion and multicast over asyncio TCP")
+    net.add_argument('--processes', type=int, nargs='+', default=[2, 4, 8, 16])
+    net.add_argument('--count', type=int, default=200,
+                     help="lock acquisitions or multicasts made by each process")
+    net.set_defaults(run=benchmark_net)
+
+    args = parser.parse_args()
+    args.run(args)
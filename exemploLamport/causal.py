@@ -0,0 +1,121 @@
+"""Causal delivery of broadcast messages stamped with vector clocks.
+
+A message from sender s with timestamp V can be delivered once the receiver
+has delivered exactly V[s] - 1 messages from s and at least V[k] messages
+from every other process k. Messages that arrive early are held back.
+
+Held-back messages are indexed by the first dependency they are still
+missing, as a (process, count) key. Delivering a message from s only wakes
+the messages waiting on s reaching its new count, so the buffer is never
+rescanned as a whole.
+"""
+
+from array import array
+from operator import gt
+
+from clocks import zeros
+
+class CausalMessage:
+    __slots__ = ('sender_id', 'counters', 'content')
+
+    def __init__(self, sender_id, counters, content):
+        self.sender_id = sender_id
+        self.counters = counters
+        self.content = content
+
+    def __repr__(self):
+        return f"CausalMessage(sender_id={self.sender_id}, counters={list(self.counters)}, content={self.content!r})"
+
+class CausalDeliveryBuffer:
+    """Hold-back queue for one receiver.
+
+    delivered[k] counts the messages from process k delivered so far; when
+    senders increment their own entry once per broadcast this is also the
+    receiver's view of the vector clock.
+    """
+
+    def __init__(self, total_processes):
+        self.delivered = zeros(total_processes)
+        self.held = 0
+        self.duplicates = 0
+        self._waiting = {}
+
+    def _missing(self, message):
+        """First unmet dependency of message as a (process, count) key.
+
+        Returns None if the message can be delivered now.
+        """
+        sender = message.sender_id
+        expected = self.delivered[sender] + 1
+        counters = message.counters
+        if counters[sender] > expected:
+            return sender, counters[sender] - 1
+        ahead = list(map(gt, counters, self.delivered))
+        ahead[sender] = False
+        try:
+            index = ahead.index(True)
+        except ValueError:
+            return None
+        return index, counters[index]
+
+    def receive(self, message):
+        """Accepts a message and returns every message it made deliverable, in order."""
+        sender = message.sender_id
+        if message.counters[sender] <= self.delivered[sender]:
+            self.duplicates += 1
+            return []
+
+        key = self._missing(message)
+        if key is not None:
+            self._waiting.setdefault(key, []).append(message)
+            self.held += 1
+            return []
+
+        delivered = []
+        ready = [message]
+        while ready:
+            message = ready.pop()
+            sender = message.sender_id
+            # A held copy of a message wakes on the same key as the original
+            if message.counters[sender] <= self.delivered[sender]:
+                self.duplicates += 1
+                continue
+            count = self.delivered[sender] + 1
+            self.delivered[sender] = count
+            delivered.append(message)
+
+            for waiting in self._waiting.pop((sender, count), ()):
+                self.held -= 1
+                if waiting.counters[waiting.sender_id] <= self.delivered[waiting.sender_id]:
+                    self.duplicates += 1
+                    continue
+                key = self._missing(waiting)
+                if key is None:
+                    ready.append(waiting)
+                else:
+                    self._waiting.setdefault(key, []).append(waiting)
+                    self.held += 1
+        return delivered
+
+class CausalProcess:
+    """Process that broadcasts with vector clocks and delivers causally."""
+
+    def __init__(self, process_id, total_processes):
+        self.process_id = process_id
+        self.total_processes = total_processes
+        self.buffer = CausalDeliveryBuffer(total_processes)
+        self.mailbox = []
+
+    def broadcast(self, content):
+        counters = array('Q', self.buffer.delivered)
+        counters[self.process_id] += 1
+        # A process delivers its own message as soon as it sends it
+        self.buffer.delivered[self.process_id] += 1
+        message = CausalMessage(self.process_id, counters, content)
+        self.mailbox.append(message)
+        return message
+
+    def receive_message(self, message):
+        delivered = self.buffer.receive(message)
+        self.mailbox.extend(delivered)
+        return delivered
@@ -0,0 +1,181 @@
+"""Vector clocks and hybrid logical clocks to go along with lamport.py.
+
+A scalar Lamport clock only guarantees that a -> b implies L(a) < L(b); it
+cannot tell two concurrent events apart. Vector clocks can, and hybrid
+logical clocks keep a single 64-bit timestamp that stays close to wall time.
+
+Vector timestamps are array('Q') instances with one counter per process, so
+merge and compare run over C arrays through map() instead of Python loops.
+"""
+
+from array import array
+import itertools
+from operator import sub
+import struct
+import sys
+import time
+
+# Distinct and all truthy, so `if compare(a, b):` cannot mix EQUAL and CONCURRENT up
+BEFORE = 'before'
+EQUAL = 'equal'
+AFTER = 'after'
+CONCURRENT = 'concurrent'
+
+_DENSE = 0
+_SPARSE = 1
+_HEADER = struct.Struct('<BI')   # format, total_processes
+_SPARSE_COUNT = struct.Struct('<I')
+
+def zeros(total_processes):
+    return array('Q', bytes(8 * total_processes))
+
+def _check_lengths(a, b):
+    if len(a) != len(b):
+        raise ValueError(f"vector clocks have different sizes: {len(a)} and {len(b)}")
+
+def merge(a, b):
+    """Element-wise maximum of two vector timestamps."""
+    _check_lengths(a, b)
+    return array('Q', map(max, a, b))
+
+def compare(a, b):
+    """Causal order between two vector timestamps.
+
+    Returns BEFORE if a happened before b, AFTER if b happened before a,
+    EQUAL if they are identical and CONCURRENT otherwise.
+    """
+    _check_lengths(a, b)
+    if a == b:
+        return EQUAL
+    diff = list(map(sub, a, b))
+    low = min(diff)
+    high = max(diff)
+    if low >= 0:
+        return AFTER
+    if high <= 0:
+        return BEFORE
+    return CONCURRENT
+
+def encode(counters, compress=True):
+    """Serializes a vector timestamp to bytes.
+
+    With compress=True a clock with few non-zero entries, which is the usual
+    case in large clusters where each process talks to a handful of others,
+    is written as (index, value) pairs whenever that is smaller than the
+    dense array.
+    """
+    total = len(counters)
+    if compress:
+        indexes = array('I', itertools.compress(range(total), counters))
+        if len(indexes) * 12 + _SPARSE_COUNT.size < total * 8:
+            values = array('Q', filter(None, counters))
+            if sys.byteorder == 'big':
+                indexes.byteswap()
+                values.byteswap()
+            return b''.join((_HEADER.pack(_SPARSE, total), _SPARSE_COUNT.pack(len(indexes)),
+                             indexes.tobytes(), values.tobytes()))
+    dense = array('Q', counters)
+    if sys.byteorder == 'big':
+        dense.byteswap()
+    return _HEADER.pack(_DENSE, total) + dense.tobytes()
+
+def decode(data):
+    """Inverse of encode()."""
+    kind, total = _HEADER.unpack_from(data)
+    offset = _HEADER.size
+    if kind == _DENSE:
+        counters = array('Q')
+        counters.frombytes(data[offset:offset + 8 * total])
+        if sys.byteorder == 'big':
+            counters.byteswap()
+        return counters
+    if kind != _SPARSE:
+        raise ValueError(f"unknown vector clock encoding {kind}")
+    (count,) = _SPARSE_COUNT.unpack_from(data, offset)
+    offset += _SPARSE_COUNT.size
+    indexes = array('I')
+    indexes.frombytes(data[offset:offset + 4 * count])
+    values = array('Q')
+    values.frombytes(data[offset + 4 * count:offset + 12 * count])
+    if sys.byteorder == 'big':
+        indexes.byteswap()
+        values.byteswap()
+    counters = zeros(total)
+    for index, value in zip(indexes, values):
+        counters[index] = value
+    return counters
+
+class VectorClock:
+    def __init__(self, process_id, total_processes):
+        self.process_id = process_id
+        self.counters = zeros(total_processes)
+
+    def increment_clock(self):
+        """Local or send event; returns a copy to attach to the message."""
+        self.counters[self.process_id] += 1
+        return array('Q', self.counters)
+
+    def receive(self, counters):
+        self.counters = merge(self.counters, counters)
+        self.counters[self.process_id] += 1
+        return array('Q', self.counters)
+
+    def compare(self, counters):
+        return compare(self.counters, counters)
+
+    def __repr__(self):
+        return f"VectorClock(process_id={self.process_id}, counters={list(self.counters)})"
+
+class HybridLogicalClock:
+    """Hybrid logical clock (Kulkarni et al.) packed into one 64-bit integer.
+
+    The upper 48 bits hold wall time in milliseconds and the lower 16 bits a
+    logical counter, so timestamps compare as plain integers. If more than
+    65535 events share a millisecond the wall part is pushed forward by one.
+    """
+
+    LOGICAL_BITS = 16
+    LOGICAL_MASK = (1 << LOGICAL_BITS) - 1
+
+    def __init__(self, physical_time=None):
+        self.physical_time = physical_time or (lambda: time.time_ns() // 1_000_000)
+        self.wall = 0
+        self.logical = 0
+
+    def _advance(self, wall, logical):
+        if logical > self.LOGICAL_MASK:
+            wall += 1
+            logical = 0
+        self.wall = wall
+        self.logical = logical
+        return (wall << self.LOGICAL_BITS) | logical
+
+    def increment_clock(self):
+        """Local or send event."""
+        now = self.physical_time()
+        if now > self.wall:
+            return self._advance(now, 0)
+        return self._advance(self.wall, self.logical + 1)
+
+    def receive(self, timestamp):
+        wall = timestamp >> self.LOGICAL_BITS
+        logical = timestamp & self.LOGICAL_MASK
+        now = self.physical_time()
+        if now > self.wall and now > wall:
+            return self._advance(now, 0)
+        if wall > self.wall:
+            return self._advance(wall, logical + 1)
+        if self.wall > wall:
+            return self._advance(self.wall, self.logical + 1)
+        return self._advance(wall, max(logical, self.logical) + 1)
+
+    def timestamp(self):
+        return (self.wall << self.LOGICAL_BITS) | self.logical
+
+    @classmethod
+    def unpack(cls, timestamp):
+        """Splits a timestamp into (wall milliseconds, logical counter)."""
+        return timestamp >> cls.LOGICAL_BITS, timestamp & cls.LOGICAL_MASK
+
+    def __repr__(self):
+        return f"HybridLogicalClock(wall={self.wall}, logical={self.logical})"
@@ -1,3 +1,4 @@
+from collections import deque
 from dataclasses import dataclass
 import threading
 import time
@@ -10,11 +11,13 @@ class Message:
     content: str
 
 class Process:
-    def __init__(self, process_id, total_processes):
+    def __init__(self, process_id, total_processes, mailbox_size=None, verbose=True):
         self.process_id = process_id
         self.logical_clock = 0
         self.total_processes = total_processes
-        self.mailbox = []
+        # mailbox_size=None keeps every message; otherwise the oldest are discarded
+        self.mailbox = deque(maxlen=mailbox_size)
+        self.verbose = verbose
         self.lock = threading.Lock()
 
     def increment_clock(self):
@@ -25,41 +28,58 @@ class Process:
     def send_message(self, receiver_process, content):
         clock = self.increment_clock()
         message = Message(self.process_id, clock, content)
-        print(f"Process {self.process_id} (clock={clock}) sends message to Process {receiver_process.process_id}: '{content}'")
+        if self.verbose:
+            print(f"Process {self.process_id} (clock={clock}) sends message to Process {receiver_process.process_id}: '{content}'")
         receiver_process.receive_message(message)
 
     def receive_message(self, message):
         with self.lock:
             self.logical_clock = max(self.logical_clock, message.logical_clock) + 1
             self.mailbox.append(message)
-            print(f"Process {self.process_id} (clock={self.logical_clock}) received message from Process {message.sender_id}: '{message.content}'")
+            if self.verbose:
+                print(f"Process {self.process_id} (clock={self.logical_clock}) received message from Process {message.sender_id}: '{message.content}'")
 
     def internal_event(self):
         clock = self.increment_clock()
-        print(f"Process {self.process_id} (clock={clock}) performs an internal event")
+        if self.verbose:
+            print(f"Process {self.process_id} (clock={clock}) performs an internal event")
 
-def simulate_process(process):
-    for _ in range(3):
-        time.sleep(random.uniform(0.1, 0.5))
-        action = random.choice(["internal", "send"])
+def simulate_process(process, processes, events=3, delay=(0.1, 0.5), rng=random):
+    for _ in range(events):
+        time.sleep(rng.uniform(*delay))
+        action = rng.choice(["internal", "send"])
         
         if action == "internal":
             process.internal_event()
         else:
-            other_process = random.choice([p for p in processes if p != process])
+            other_process = rng.choice([p for p in processes if p != process])
             process.send_message(other_process, f"Hello from {process.process_id}")
 
-processes = [Process(i, 3) for i in range(3)]
+def run_threaded(total_processes=3, events=3, delay=(0.1, 0.5), seed=None, mailbox_size=None, verbose=True):
+    """Runs one OS thread per process, as in the original example.
 
-threads = []
-for process in processes:
-    t = threading.Thread(target=simulate_process, args=(process,))
-    threads.append(t)
-    t.start()
+    Each thread gets its own random.Random derived from seed, but the
+    interleaving still depends on the OS scheduler, so runs are not
+    reproducible. See simulation.py for the deterministic engine.
+    """
+    processes = [Process(i, total_processes, mailbox_size, verbose) for i in range(total_processes)]
+    seeder = random.Random(seed)
 
-for t in threads:
-    t.join()
+    threads = []
+    for process in processes:
+        rng = random.Random(seeder.getrandbits(64))
+        t = threading.Thread(target=simulate_process, args=(process, processes, events, delay, rng))
+        threads.append(t)
+        t.start()
 
-print("\nFinal logical clocks:")
-for process in processes:
-    print(f"Process {process.process_id}: {process.logical_clock}")
\ No newline at end of file
+    for t in threads:
+        t.join()
+
+    return processes
+
+if __name__ == '__main__':
+    processes = run_threaded()
+
+    print("\nFinal logical clocks:")
+    for process in processes:
+        print(f"Process {process.process_id}: {process.logical_clock}")
@@ -0,0 +1,402 @@
+"""Networked Lamport clocks: each process is a separate OS process talking
+asyncio TCP on localhost.
+
+On top of the same clock rules as lamport.py (increment on send, max + 1 on
+receive) it implements:
+
+- totally-ordered multicast: messages sit in a hold-back queue ordered by
+  (timestamp, sender) and are delivered once every process acknowledged them;
+- mutual exclusion with Lamport's algorithm (request queue + release) or
+  Ricart-Agrawala (deferred replies).
+
+Every message is a fixed 23-byte binary header, optionally followed by a
+payload. Frames are appended to a per-peer buffer and written once per event
+loop iteration, so a burst of acks or replies costs one write per peer.
+
+Usage:
+    python network.py --processes 4 --mode multicast --count 5
+    python network.py --processes 4 --mode mutex --algorithm ricart-agrawala
+"""
+
+from collections import deque
+import argparse
+import asyncio
+import hashlib
+import heapq
+import multiprocessing
+import socket
+import struct
+import time
+
+# kind, sender, clock, ref_clock, ref_sender, payload length
+FRAME = struct.Struct('<BHQQHH')
+
+HELLO = 0
+MULTICAST = 1
+ACK = 2
+REQUEST = 3
+REPLY = 4
+RELEASE = 5
+DONE = 6
+
+LAMPORT = 'lamport'
+RICART_AGRAWALA = 'ricart-agrawala'
+
+_SENT_AT = struct.Struct('<Q')
+
+class Node:
+    def __init__(self, process_id, ports, algorithm=LAMPORT, on_deliver=None):
+        self.process_id = process_id
+        self.ports = ports
+        self.total_processes = len(ports)
+        self.algorithm = algorithm
+        self.on_deliver = on_deliver
+        self.logical_clock = 0
+
+        self.frames_sent = 0
+        self.writes = 0
+
+        self._writers = {}
+        self._outgoing = {peer: bytearray() for peer in range(self.total_processes) if peer != process_id}
+        self._open_connections = 0
+        self._closed = None
+        self._flush_scheduled = False
+        self._loop = None
+        self._server = None
+        self._hello = set()
+        self._done = set()
+        self._ready = None
+        self._all_done = None
+
+        # Totally-ordered multicast
+        self._holdback = []
+        self._acks = {}
+        self._payloads = {}
+
+        # Mutual exclusion
+        self._requests = {}        # Lamport: process -> request timestamp
+        self._last_seen = [0] * self.total_processes
+        self._request_clock = None
+        self._replies = 0
+        self._deferred = []        # Ricart-Agrawala
+        self._in_critical_section = False
+        self._granted = None
+
+    # Clock -----------------------------------------------------------------
+
+    def increment_clock(self):
+        self.logical_clock += 1
+        return self.logical_clock
+
+    def _update_clock(self, clock):
+        self.logical_clock = max(self.logical_clock, clock) + 1
+
+    # Transport -------------------------------------------------------------
+
+    async def start(self):
+        """Listens, connects to every peer and waits until all are connected."""
+        self._loop = asyncio.get_running_loop()
+        self._ready = self._loop.create_future()
+        self._all_done = self._loop.create_future()
+        self._closed = self._loop.create_future()
+        self._server = await asyncio.start_server(self._serve, '127.0.0.1', self.ports[self.process_id])
+
+        for peer, port in enumerate(self.ports):
+            if peer == self.process_id:
+                continue
+            while True:
+                try:
+                    _, writer = await asyncio.open_connection('127.0.0.1', port)
+                    break
+                except OSError:
+                    await asyncio.sleep(0.05)
+            self._writers[peer] = writer
+            # Peers that are already running may have made us queue frames for this one
+            self._send(peer, HELLO)
+
+        if self.total_processes == 1:
+            self._ready.set_result(None)
+        await self._ready
+
+    async def stop(self):
+        """Tells the peers this process is done and waits for theirs."""
+        for peer in range(self.total_processes):
+            self._send(peer, DONE)
+        await self._all_done
+        self._flush()
+        for writer in self._writers.values():
+            writer.close()
+        if self.total_processes > 1:
+            await self._closed
+        self._server.close()
+
+    def _send(self, peer, kind, ref_clock=0, ref_sender=0, payload=b'', clock=None):
+        if clock is None:
+            clock = self.logical_clock
+        if peer == self.process_id:
+            self._loop.call_soon(self._handle, kind, self.process_id, clock, ref_clock, ref_sender, payload)
+            return
+        buffer = self._outgoing[peer]
+        buffer += FRAME.pack(kind, self.process_id, clock, ref_clock, ref_sender, len(payload))
+        if payload:
+            buffer += payload
+        self.frames_sent += 1
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _broadcast(self, kind, ref_clock=0, ref_sender=0, payload=b'', include_self=True):
+        """Sends one event to every process with a single clock tick."""
+        clock = self.increment_clock()
+        for peer in range(self.total_processes):
+            if include_self or peer != self.process_id:
+                self._send(peer, kind, ref_clock, ref_sender, payload, clock)
+        return clock
+
+    def _flush(self):
+        self._flush_scheduled = False
+        for peer, buffer in self._outgoing.items():
+            if buffer and peer in self._writers:
+                self._writers[peer].write(bytes(buffer))
+                buffer.clear()
+                self.writes += 1
+
+    async def _serve(self, reader, writer):
+        buffer = bytearray()
+        header = FRAME.size
+        self._open_connections += 1
+        try:
+            while True:
+                data = await reader.read(1 << 16)
+                if not data:
+                    break
+                buffer += data
+                offset = 0
+                end = len(buffer)
+                while end - offset >= header:
+                    kind, sender, clock, ref_clock, ref_sender, length = FRAME.unpack_from(buffer, offset)
+                    if end - offset - header < length:
+                        break
+                    start = offset + header
+                    payload = bytes(buffer[start:start + length]) if length else b''
+                    offset = start + length
+                    self._handle(kind, sender, clock, ref_clock, ref_sender, payload)
+                del buffer[:offset]
+        finally:
+            writer.close()
+            self._open_connections -= 1
+            if self._open_connections == 0 and self._done and not self._closed.done():
+                self._closed.set_result(None)
+
+    def _handle(self, kind, sender, clock, ref_clock, ref_sender, payload):
+        self._update_clock(clock)
+        self._last_seen[sender] = max(self._last_seen[sender], clock)
+
+        if kind == MULTICAST:
+            key = (clock, sender)
+            heapq.heappush(self._holdback, key)
+            self._payloads[key] = payload
+            self._broadcast(ACK, clock, sender)
+        elif kind == ACK:
+            key = (ref_clock, ref_sender)
+            self._acks[key] = self._acks.get(key, 0) + 1
+            self._deliver_ready()
+        elif kind == REQUEST:
+            self._on_request(sender, clock)
+        elif kind == REPLY:
+            self._replies += 1
+            self._try_enter()
+        elif kind == RELEASE:
+            self._requests.pop(sender, None)
+            self._try_enter()
+        elif kind == HELLO:
+            self._hello.add(sender)
+            if len(self._hello) == self.total_processes - 1 and not self._ready.done():
+                self._ready.set_result(None)
+        elif kind == DONE:
+            self._done.add(sender)
+            if len(self._done) == self.total_processes and not self._all_done.done():
+                self._all_done.set_result(None)
+
+    # Totally-ordered multicast --------------------------------------------
+
+    def multicast(self, payload=b''):
+        """Sends payload to every process, including this one."""
+        return self._broadcast(MULTICAST, payload=payload)
+
+    def _deliver_ready(self):
+        holdback = self._holdback
+        while holdback and self._acks.get(holdback[0], 0) == self.total_processes:
+            key = heapq.heappop(holdback)
+            del self._acks[key]
+            payload = self._payloads.pop(key)
+            if self.on_deliver is not None:
+                self.on_deliver(key[0], key[1], payload)
+
+    # Mutual exclusion ------------------------------------------------------
+
+    async def acquire(self):
+        self._granted = self._loop.create_future()
+        self._replies = 0
+        self._request_clock = self._broadcast(REQUEST, include_self=False)
+        if self.algorithm == LAMPORT:
+            self._requests[self.process_id] = self._request_clock
+        self._try_enter()
+        await self._granted
+
+    def release(self):
+        self._in_critical_section = False
+        self._request_clock = None
+        if self.algorithm == LAMPORT:
+            del self._requests[self.process_id]
+            self._broadcast(RELEASE, include_self=False)
+        else:
+            clock = self.increment_clock()
+            for peer in self._deferred:
+                self._send(peer, REPLY, clock=clock)
+            self._deferred.clear()
+
+    def _on_request(self, sender, clock):
+        if self.algorithm == LAMPORT:
+            self._requests[sender] = clock
+            self._send(sender, REPLY, clock=self.increment_clock())
+            return
+        mine = self._request_clock
+        if self._in_critical_section or (mine is not None and (mine, self.process_id) < (clock, sender)):
+            self._deferred.append(sender)
+        else:
+            self._send(sender, REPLY, clock=self.increment_clock())
+
+    def _try_enter(self):
+        if self._request_clock is None or self._in_critical_section:
+            return
+        if self.algorithm == LAMPORT:
+            # Own request heads the queue and every peer has sent something newer
+            head = min(self._requests.items(), key=lambda item: (item[1], item[0]))
+            if head[0] != self.process_id:
+                return
+            if any(seen <= self._request_clock for peer, seen in enumerate(self._last_seen)
+                   if peer != self.process_id):
+                return
+        elif self._replies < self.total_processes - 1:
+            return
+        self._in_critical_section = True
+        self._granted.set_result(None)
+
+async def _run_node(process_id, ports, mode, count, algorithm, critical_section, hold):
+    latencies = []
+    order = hashlib.sha256()
+    delivered = 0
+    finished = None
+
+    def on_deliver(clock, sender, payload):
+        nonlocal delivered
+        (sent_at,) = _SENT_AT.unpack(payload)
+        latencies.append(time.monotonic_ns() - sent_at)
+        order.update(FRAME.pack(MULTICAST, sender, clock, 0, 0, 0))
+        delivered += 1
+        if delivered == count * len(ports):
+            finished.set_result(None)
+
+    node = Node(process_id, ports, algorithm, on_deliver)
+    await node.start()
+    finished = asyncio.get_running_loop().create_future()
+    start = time.perf_counter()
+
+    if mode == 'multicast':
+        for _ in range(count):
+            # monotonic_ns is system-wide on Linux, so it is comparable across processes
+            node.multicast(_SENT_AT.pack(time.monotonic_ns()))
+            await asyncio.sleep(0)
+        await finished
+    else:
+        for _ in range(count):
+            await node.acquire()
+            with critical_section.get_lock():
+                critical_section.value += 1
+                overlap = critical_section.value > 1
+            if overlap:
+                raise RuntimeError(f"process {process_id} entered the critical section concurrently")
+            # Hold the lock across an await so other nodes' frames are handled
+            # meanwhile; a second holder would then see the raised counter
+            await asyncio.sleep(hold)
+            with critical_section.get_lock():
+                critical_section.value -= 1
+            node.release()
+
+    elapsed = time.perf_counter() - start
+    await node.stop()
+    return {
+        'process_id': process_id,
+        'elapsed': elapsed,
+        'latencies': latencies,
+        'order': order.hexdigest(),
+        'logical_clock': node.logical_clock,
+        'frames_sent': node.frames_sent,
+        'writes': node.writes,
+    }
+
+def node_main(process_id, ports, mode, count, algorithm, critical_section, hold, results):
+    """Entry point of each OS process."""
+    results.put(asyncio.run(_run_node(process_id, ports, mode, count, algorithm, critical_section, hold)))
+
+def free_ports(total):
+    sockets = []
+    for _ in range(total):
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        sockets.append(sock)
+    ports = [sock.getsockname()[1] for sock in sockets]
+    for sock in sockets:
+        sock.close()
+    return ports
+
+def run_cluster(total_processes, mode='multicast', count=10, algorithm=LAMPORT, timeout=120, hold=0):
+    """Starts one OS process per node and returns their results by process id.
+
+    For multicast runs it also checks that every node delivered the same
+    sequence of messages. In mutex runs each node keeps the lock for `hold`
+    seconds and fails if another node is in the critical section meanwhile.
+    """
+    ports = free_ports(total_processes)
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    critical_section = context.Value('i', 0)
+    workers = [context.Process(target=node_main,
+                               args=(i, ports, mode, count, algorithm, critical_section, hold, results))
+               for i in range(total_processes)]
+    for worker in workers:
+        worker.start()
+    collected = deque()
+    try:
+        for _ in workers:
+            collected.append(results.get(timeout=timeout))
+    finally:
+        for worker in workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+    collected = sorted(collected, key=lambda result: result['process_id'])
+    if mode == 'multicast' and len({result['order'] for result in collected}) != 1:
+        raise RuntimeError("nodes delivered multicasts in different orders")
+    return collected
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Lamport clocks over asyncio TCP between OS processes")
+    parser.add_argument('--processes', type=int, default=3)
+    parser.add_argument('--mode', choices=['multicast', 'mutex'], default='multicast')
+    parser.add_argument('--algorithm', choices=[LAMPORT, RICART_AGRAWALA], default=LAMPORT)
+    parser.add_argument('--count', type=int, default=5,
+                        help="multicasts sent or lock acquisitions made by each process")
+    parser.add_argument('--hold', type=float, default=0.001,
+                        help="seconds each process keeps the lock in mutex mode")
+    args = parser.parse_args()
+
+    results = run_cluster(args.processes, args.mode, args.count, args.algorithm, hold=args.hold)
+
+    print("\nFinal logical clocks:")
+    for result in results:
+        print(f"Process {result['process_id']}: {result['logical_clock']} "
+              f"({result['frames_sent']} frames in {result['writes']} writes)")
+    if args.mode == 'multicast':
+        print(f"\nAll {args.processes} processes delivered the same order ({results[0]['order'][:12]})")
@@ -0,0 +1,185 @@
+"""Discrete-event version of the Lamport clock example.
+
+Instead of one OS thread per process sleeping between events, a single loop
+pops events from a heap ordered by virtual time. The send/receive/internal
+rules are the same as in lamport.py, but runs are reproducible from a seed
+and scale to tens of thousands of processes.
+"""
+
+from collections import deque
+import argparse
+import heapq
+import random
+import time
+
+STEP = 0      # process wakes up and performs an internal event or a send
+DELIVER = 1   # a message reaches its receiver
+
+class SimMessage:
+    __slots__ = ('sender_id', 'logical_clock', 'content')
+
+    def __init__(self, sender_id, logical_clock, content):
+        self.sender_id = sender_id
+        self.logical_clock = logical_clock
+        self.content = content
+
+    def __repr__(self):
+        return f"SimMessage(sender_id={self.sender_id}, logical_clock={self.logical_clock}, content={self.content!r})"
+
+class Simulation:
+    """Seedable scheduler running every process on a shared virtual clock.
+
+    Process state is kept in flat lists indexed by process id rather than in
+    one object per process. With latency=(0, 0) a message is received in the
+    same step it is sent, like Process.send_message does; any other range
+    schedules the delivery as a separate event.
+    """
+
+    def __init__(self, total_processes, events=3, delay=(0.1, 0.5), latency=(0.0, 0.0),
+                 seed=None, mailbox_size=None, verbose=False):
+        if total_processes < 2:
+            raise ValueError("at least two processes are needed to exchange messages")
+        self.total_processes = total_processes
+        self.events = events
+        self.delay = delay
+        self.latency = latency
+        self.verbose = verbose
+        self.rng = random.Random(seed)
+
+        self.logical_clocks = [0] * total_processes
+        self.mailboxes = [deque(maxlen=mailbox_size) for _ in range(total_processes)]
+        self.mailbox_size = mailbox_size
+        self.remaining = [events] * total_processes
+        self.now = 0.0
+
+        self.internal_events = 0
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+
+        self._queue = []
+        self._seq = 0
+        self._greetings = [f"Hello from {i}" for i in range(total_processes)]
+
+        if events > 0:
+            low, high = delay
+            span = high - low
+            rand = self.rng.random
+            for pid in range(total_processes):
+                self._push(low + span * rand(), STEP, pid, None)
+
+    def _push(self, at, kind, pid, message):
+        self._seq += 1
+        heapq.heappush(self._queue, (at, self._seq, kind, pid, message))
+
+    @property
+    def processed(self):
+        return self.internal_events + self.sent + self.received
+
+    def run(self, until=None):
+        """Processes events until the heap is empty or virtual time passes until."""
+        queue = self._queue
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        rand = self.rng.random
+        clocks = self.logical_clocks
+        mailboxes = self.mailboxes
+        remaining = self.remaining
+        greetings = self._greetings
+        verbose = self.verbose
+        bounded = self.mailbox_size is not None
+        limit = self.mailbox_size
+        n = self.total_processes
+        delay_low, delay_high = self.delay
+        delay_span = delay_high - delay_low
+        latency_low, latency_high = self.latency
+        latency_span = latency_high - latency_low
+        inline = latency_high <= 0
+        seq = self._seq
+        internal_events = sent = received = dropped = 0
+
+        now = self.now
+        while queue:
+            if until is not None and queue[0][0] > until:
+                break
+            now, _, kind, pid, message = heappop(queue)
+
+            if kind == STEP:
+                clock = clocks[pid] + 1
+                clocks[pid] = clock
+                if rand() < 0.5:
+                    internal_events += 1
+                    if verbose:
+                        print(f"Process {pid} (clock={clock}) performs an internal event")
+                else:
+                    # Uniform choice among the other n - 1 processes
+                    receiver = int(rand() * (n - 1))
+                    if receiver >= pid:
+                        receiver += 1
+                    message = SimMessage(pid, clock, greetings[pid])
+                    sent += 1
+                    if verbose:
+                        print(f"Process {pid} (clock={clock}) sends message to Process {receiver}: '{message.content}'")
+
+                left = remaining[pid] - 1
+                remaining[pid] = left
+                if left > 0:
+                    seq += 1
+                    heappush(queue, (now + delay_low + delay_span * rand(), seq, STEP, pid, None))
+
+                if message is None:
+                    continue
+                if not inline:
+                    seq += 1
+                    heappush(queue, (now + latency_low + latency_span * rand(), seq, DELIVER, receiver, message))
+                    continue
+                pid = receiver
+
+            # DELIVER, either popped from the heap or inlined right after a send
+            clock = clocks[pid]
+            if message.logical_clock > clock:
+                clock = message.logical_clock
+            clock += 1
+            clocks[pid] = clock
+            mailbox = mailboxes[pid]
+            if bounded and len(mailbox) == limit:
+                dropped += 1
+            mailbox.append(message)
+            received += 1
+            if verbose:
+                print(f"Process {pid} (clock={clock}) received message from Process {message.sender_id}: '{message.content}'")
+
+        self.now = now
+        self._seq = seq
+        self.internal_events += internal_events
+        self.sent += sent
+        self.received += received
+        self.dropped += dropped
+        return self
+
+def run_simulated(total_processes=3, events=3, delay=(0.1, 0.5), latency=(0.0, 0.0),
+                  seed=None, mailbox_size=None, verbose=False):
+    """Convenience wrapper mirroring lamport.run_threaded."""
+    return Simulation(total_processes, events, delay, latency, seed, mailbox_size, verbose).run()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Discrete-event simulation of Lamport logical clocks")
+    parser.add_argument('--processes', type=int, default=3)
+    parser.add_argument('--events', type=int, default=3, help="events performed by each process")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--latency', type=float, nargs=2, default=(0.0, 0.0), metavar=('MIN', 'MAX'))
+    parser.add_argument('--mailbox-size', type=int, default=None)
+    parser.add_argument('--quiet', action='store_true')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    sim = run_simulated(args.processes, args.events, latency=tuple(args.latency), seed=args.seed,
+                        mailbox_size=args.mailbox_size, verbose=not args.quiet)
+    elapsed = time.perf_counter() - start
+
+    if args.processes <= 20:
+        print("\nFinal logical clocks:")
+        for pid, clock in enumerate(sim.logical_clocks):
+            print(f"Process {pid}: {clock}")
+    print(f"\n{sim.processed} events in {elapsed:.3f}s "
+          f"(internal={sim.internal_events}, sent={sim.sent}, received={sim.received}, dropped={sim.dropped})")
@@ -0,0 +1,71 @@
+"""Tests for causal delivery.
+
+Run from this directory with:
+    python -m unittest test_causal
+"""
+
+from array import array
+import unittest
+
+from causal import CausalDeliveryBuffer, CausalMessage, CausalProcess
+
+def _message(sender, counters, content):
+    return CausalMessage(sender, array('Q', counters), content)
+
+class CausalDeliveryBufferTest(unittest.TestCase):
+    def test_in_order_message_is_delivered_at_once(self):
+        buffer = CausalDeliveryBuffer(3)
+        delivered = buffer.receive(_message(0, [1, 0, 0], 'a'))
+        self.assertEqual([m.content for m in delivered], ['a'])
+        self.assertEqual(list(buffer.delivered), [1, 0, 0])
+
+    def test_message_is_held_until_its_dependency_arrives(self):
+        buffer = CausalDeliveryBuffer(3)
+        # b was sent by process 1 after it delivered a from process 0
+        self.assertEqual(buffer.receive(_message(1, [1, 1, 0], 'b')), [])
+        self.assertEqual(buffer.held, 1)
+        delivered = buffer.receive(_message(0, [1, 0, 0], 'a'))
+        self.assertEqual([m.content for m in delivered], ['a', 'b'])
+        self.assertEqual(buffer.held, 0)
+        self.assertEqual(list(buffer.delivered), [1, 1, 0])
+
+    def test_messages_from_one_sender_are_delivered_in_sequence(self):
+        buffer = CausalDeliveryBuffer(2)
+        self.assertEqual(buffer.receive(_message(0, [3, 0], 'c')), [])
+        self.assertEqual(buffer.receive(_message(0, [2, 0], 'b')), [])
+        delivered = buffer.receive(_message(0, [1, 0], 'a'))
+        self.assertEqual([m.content for m in delivered], ['a', 'b', 'c'])
+
+    def test_duplicate_of_delivered_message_is_dropped(self):
+        buffer = CausalDeliveryBuffer(2)
+        buffer.receive(_message(0, [1, 0], 'a'))
+        self.assertEqual(buffer.receive(_message(0, [1, 0], 'a')), [])
+        self.assertEqual(buffer.duplicates, 1)
+        self.assertEqual(list(buffer.delivered), [1, 0])
+
+    def test_duplicate_of_held_message_is_delivered_once(self):
+        buffer = CausalDeliveryBuffer(3)
+        buffer.receive(_message(1, [1, 1, 0], 'b'))
+        buffer.receive(_message(1, [1, 1, 0], 'b'))
+        delivered = buffer.receive(_message(0, [1, 0, 0], 'a'))
+        self.assertEqual([m.content for m in delivered], ['a', 'b'])
+        self.assertEqual(list(buffer.delivered), [1, 1, 0])
+        self.assertEqual(buffer.duplicates, 1)
+        self.assertEqual(buffer.held, 0)
+        # The next message from process 1 is not mistaken for a duplicate
+        delivered = buffer.receive(_message(1, [1, 2, 0], 'c'))
+        self.assertEqual([m.content for m in delivered], ['c'])
+
+class CausalProcessTest(unittest.TestCase):
+    def test_reply_is_not_delivered_before_the_message_it_answers(self):
+        processes = [CausalProcess(pid, 3) for pid in range(3)]
+        question = processes[0].broadcast('question')
+        processes[1].receive_message(question)
+        answer = processes[1].broadcast('answer')
+
+        self.assertEqual(processes[2].receive_message(answer), [])
+        delivered = processes[2].receive_message(question)
+        self.assertEqual([m.content for m in delivered], ['question', 'answer'])
+
+if __name__ == '__main__':
+    unittest.main()